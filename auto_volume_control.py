@@ -7,6 +7,9 @@ from ctypes import cast, POINTER
 from comtypes import CLSCTX_ALL
 from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
 import time
+import os
+
+from volume_history import DEFAULT_PATH, VolumeHistory
 
 class AutoVolumeControl:
     def __init__(self):
@@ -28,6 +31,29 @@ class AutoVolumeControl:
         self.current_db = -100
         self.current_system_volume = 0.5
         
+        # История уровней и решений (читается через volume_history.py)
+        self.history = self.open_history()
+        
+    def open_history(self):
+        """Открыть файл истории; повреждённый пересоздаётся, а если не вышло — работаем без истории"""
+        try:
+            return VolumeHistory()
+        except ValueError as e:
+            print(f"Файл истории повреждён ({e}), создаём новый")
+        except OSError as e:
+            # Нет доступа или файл занят — сам файл может быть в порядке, не трогаем его
+            print(f"История громкости отключена: {e}")
+            return None
+        
+        # Повреждённый файл откладываем в сторону, а не удаляем
+        bad_path = f"{DEFAULT_PATH}.{time.strftime('%Y%m%d_%H%M%S')}.bad"
+        try:
+            os.replace(DEFAULT_PATH, bad_path)
+            return VolumeHistory()
+        except (ValueError, OSError) as e:
+            print(f"История громкости отключена: {e}")
+            return None
+    
     def calculate_db(self, audio_data):
         """Вычислить уровень звука в dB"""
         if len(audio_data) == 0:
@@ -58,13 +84,16 @@ class AutoVolumeControl:
         """Автоматическая регулировка громкости"""
         self.current_db = current_db
         
+        # Преобразуем текущий уровень звука в относительную громкость
+        perceived_loudness = self.normalize_db_to_volume(current_db)
+        
         # Если звук слишком тихий (тишина), не меняем громкость
         if current_db < self.min_db_threshold:
+            if self.history:
+                self.history.record(time.time(), current_db, perceived_loudness,
+                                    self.current_system_volume, self.current_system_volume)
             return
         
-        # Преобразуем текущий уровень звука в относительную громкость
-        perceived_loudness = self.normalize_db_to_volume(current_db)
-        
         # Получаем текущую системную громкость
         current_sys_vol = self.volume.GetMasterVolumeLevelScalar()
         self.current_system_volume = current_sys_vol
@@ -82,6 +111,8 @@ class AutoVolumeControl:
         
         # Устанавливаем новую громкость
         self.volume.SetMasterVolumeLevelScalar(new_vol, None)
+        if self.history:
+            self.history.record(time.time(), current_db, perceived_loudness, current_sys_vol, new_vol)
     
     def audio_callback(self, indata, frames, time_info, status):
         """Callback для обработки аудио данных"""
@@ -122,6 +153,8 @@ class AutoVolumeControl:
     def cleanup(self):
         """Очистка ресурсов"""
         self.stop_monitoring()
+        if self.history:
+            self.history.flush()
 
 
 class VolumeControlGUI:
@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+"""
+Хранилище data/portfolio.json с атомарной записью и журналом изменений.
+
+Вместо ручных полных копий (portfolio.json.backup, portfolio_backup_*.json)
+история хранится в журнале portfolio.json.journal: одна JSON-строка на ревизию,
+в которой записаны только изменённые проекты. Время от времени в журнал
+пишется полный снимок, чтобы восстановление любой ревизии не требовало
+проигрывать всю историю с начала.
+
+Использование из командной строки:
+    python portfolio_store.py log
+    python portfolio_store.py restore 12
+    python portfolio_store.py compact
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+DEFAULT_PATH = os.path.join('data', 'portfolio.json')
+SNAPSHOT_EVERY = 50
+
+
+def serialize(data):
+    """Сериализует данные в том же виде, что и остальные скрипты сайта"""
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _fsync_dir(path):
+    """Сбрасывает на диск запись каталога (на Windows не поддерживается)"""
+    if os.name != 'posix':
+        return
+    fd = os.open(path or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, text):
+    """Атомарно записывает текст: временный файл + fsync + rename"""
+    folder = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.',
+                                    suffix='.tmp', dir=folder or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_dir(folder)
+
+
+def can_diff(data):
+    """
+    Можно ли хранить версию как изменения по проектам: у каждого проекта
+    должен быть уникальный строковый id, иначе проекты склеятся при сравнении.
+    """
+    projects = data.get('projects', []) if isinstance(data, dict) else None
+    if not isinstance(projects, list):
+        return False
+    ids = [p.get('id') if isinstance(p, dict) else None for p in projects]
+    return all(isinstance(i, str) for i in ids) and len(set(ids)) == len(ids)
+
+
+def diff_projects(old, new):
+    """
+    Вычисляет изменения между двумя версиями portfolio.json по проектам.
+    Обе версии должны проходить can_diff().
+    """
+    ops = []
+    old_projects = {p['id']: p for p in old.get('projects', [])}
+    new_projects = {p['id']: p for p in new.get('projects', [])}
+
+    for project_id, project in new_projects.items():
+        if old_projects.get(project_id) != project:
+            ops.append({'op': 'put', 'id': project_id, 'project': project})
+
+    for project_id in old_projects:
+        if project_id not in new_projects:
+            ops.append({'op': 'del', 'id': project_id})
+
+    new_order = list(new_projects)
+    if [i for i in old_projects if i in new_projects] != new_order:
+        ops.append({'op': 'order', 'ids': new_order})
+
+    # Прочие ключи верхнего уровня сохраняем вместе с порядком ключей,
+    # чтобы восстановленный файл совпадал с исходным побайтно
+    old_meta = {k: v for k, v in old.items() if k != 'projects'}
+    new_meta = {k: v for k, v in new.items() if k != 'projects'}
+    if old_meta != new_meta or list(old) != list(new):
+        ops.append({'op': 'meta', 'keys': list(new), 'value': new_meta})
+
+    return ops
+
+
+def apply_ops(data, ops):
+    """Применяет изменения из журнала к данным и возвращает новую версию"""
+    projects = {p['id']: p for p in data.get('projects', [])}
+    order = list(projects)
+    keys = list(data)
+    meta = {k: v for k, v in data.items() if k != 'projects'}
+
+    for op in ops:
+        kind = op['op']
+        if kind == 'put':
+            if op['id'] not in projects:
+                order.append(op['id'])
+            projects[op['id']] = op['project']
+        elif kind == 'del':
+            projects.pop(op['id'], None)
+            order.remove(op['id'])
+        elif kind == 'order':
+            order = list(op['ids'])
+        elif kind == 'meta':
+            keys = list(op['keys'])
+            meta = dict(op['value'])
+        else:
+            raise ValueError(f"Неизвестная операция в журнале: {kind}")
+
+    meta['projects'] = [projects[i] for i in order]
+    return {k: meta[k] for k in keys if k in meta}
+
+
+class PortfolioStore:
+    """Атомарное хранилище portfolio.json с журналом ревизий"""
+
+    def __init__(self, path=DEFAULT_PATH, snapshot_every=SNAPSHOT_EVERY):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.snapshot_every = snapshot_every
+
+    def load(self):
+        """Загружает текущую версию portfolio.json"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _read_current_text(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8', newline='') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _repair_tail(self):
+        """
+        Обрезает недописанный хвост журнала после сбоя, чтобы следующая
+        запись не приклеилась к оборванной строке.
+        """
+        try:
+            with open(self.journal_path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return
+
+        good = raw.rfind(b'\n') + 1
+        while good:
+            start = raw.rfind(b'\n', 0, good - 1) + 1
+            try:
+                json.loads(raw[start:good].decode('utf-8'))
+                break
+            except ValueError:
+                good = start
+
+        if good != len(raw):
+            with open(self.journal_path, 'rb+') as f:
+                f.truncate(good)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def entries(self):
+        """Возвращает все записи журнала по порядку"""
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+
+        entries = []
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # Недописанная последняя строка после сбоя — просто отбрасываем
+                if number == len(lines):
+                    break
+                raise
+        return entries
+
+    def _append(self, entry):
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with open(self.journal_path, 'a', encoding='utf-8', newline='') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def save(self, data, message=''):
+        """
+        Сохраняет данные, если они изменились.
+        Возвращает номер новой ревизии или None, если запись не понадобилась.
+        """
+        text = serialize(data)
+        current_text = self._read_current_text()
+        if text == current_text:
+            return None
+
+        self._repair_tail()
+        entries = self.entries()
+        head = entries[-1] if entries else None
+        rev = head['rev'] if head else 0
+        since_snapshot = 0
+        for entry in reversed(entries):
+            if entry['type'] != 'diff':
+                break
+            since_snapshot += 1
+
+        current = None
+        if current_text is not None:
+            try:
+                current = json.loads(current_text)
+            except ValueError:
+                # Файл повреждён — новая ревизия пишется полным снимком
+                current = None
+
+        # Файл правили в обход хранилища — фиксируем его состояние снимком.
+        # sha всегда считается от serialize(), а хеш текста на диске хранится
+        # отдельно, если правка вручную изменила форматирование.
+        # Нечитаемый файл сохраняется как есть, записью типа raw
+        file_sha = _digest(current_text) if current_text is not None else None
+        if current_text is not None and (head is None or head.get('file_sha', head['sha']) != file_sha):
+            rev += 1
+            if current is None:
+                print(f"[!] {self.path} не читается как JSON, сохраняем его текст в журнал")
+                snapshot = {'rev': rev, 'time': time.time(), 'type': 'raw',
+                            'message': 'повреждённый файл', 'sha': file_sha, 'text': current_text}
+            else:
+                snapshot = {'rev': rev, 'time': time.time(), 'type': 'snapshot',
+                            'message': 'внешнее изменение', 'sha': _digest(serialize(current)),
+                            'data': current}
+                if snapshot['sha'] != file_sha:
+                    snapshot['file_sha'] = file_sha
+            self._append(snapshot)
+            since_snapshot = 0
+
+        rev += 1
+        entry = {'rev': rev, 'time': time.time(), 'message': message, 'sha': _digest(text)}
+        if (current is None or since_snapshot + 1 >= self.snapshot_every
+                or not can_diff(current) or not can_diff(data)):
+            entry.update(type='snapshot', data=data)
+        else:
+            entry.update(type='diff', ops=diff_projects(current, data))
+        self._append(entry)
+
+        atomic_write(self.path, text)
+        return rev
+
+    def _check_rev(self, entries, rev):
+        if not entries or not entries[0]['rev'] <= rev <= entries[-1]['rev']:
+            known = f"{entries[0]['rev']}–{entries[-1]['rev']}" if entries else "журнал пуст"
+            raise ValueError(f"Ревизия {rev} отсутствует в журнале ({known})")
+
+    def revision(self, rev):
+        """Восстанавливает содержимое portfolio.json на указанной ревизии"""
+        entries = self.entries()
+        self._check_rev(entries, rev)
+
+        base = None
+        pending = []
+        target = None
+        for entry in entries:
+            if entry['rev'] > rev:
+                break
+            target = entry
+            if entry['type'] == 'snapshot':
+                base = entry['data']
+                pending = []
+            elif entry['type'] == 'raw':
+                base = None
+                pending = []
+            else:
+                pending.append(entry)
+
+        if target['type'] == 'raw':
+            raise ValueError(f"Ревизия {rev} — повреждённый файл, сохранённый только как текст")
+        if base is None:
+            raise ValueError(f"Ревизия {rev} не восстанавливается: нет предшествующего снимка")
+
+        for entry in pending:
+            base = apply_ops(base, entry['ops'])
+
+        if _digest(serialize(base)) != target['sha']:
+            raise ValueError(f"Ревизия {rev}: контрольная сумма не совпадает, журнал повреждён")
+        return base
+
+    def restore(self, rev):
+        """Возвращает portfolio.json к указанной ревизии (как новую ревизию)"""
+        return self.save(self.revision(rev), message=f'восстановление ревизии {rev}')
+
+    def compact(self, keep_from=None):
+        """
+        Сжимает журнал: всё, что старше keep_from (по умолчанию — последняя
+        ревизия), заменяется одним снимком.
+        """
+        entries = self.entries()
+        if not entries:
+            return 0
+        if keep_from is None:
+            keep_from = entries[-1]['rev']
+        self._check_rev(entries, keep_from)
+
+        base = self.revision(keep_from)
+        target = next(e for e in entries if e['rev'] == keep_from)
+        snapshot = {'rev': keep_from, 'time': target['time'], 'type': 'snapshot',
+                    'message': 'сжатие журнала', 'sha': _digest(serialize(base)), 'data': base}
+        # Без хеша текста на диске следующее save() приняло бы файл,
+        # отформатированный вручную, за внешнее изменение
+        if 'file_sha' in target:
+            snapshot['file_sha'] = target['file_sha']
+        kept = [snapshot] + [e for e in entries if e['rev'] > keep_from]
+
+        lines = [json.dumps(e, ensure_ascii=False, separators=(',', ':')) + '\n' for e in kept]
+        atomic_write(self.journal_path, ''.join(lines))
+        return len(entries) - len(kept)
+
+
+def main(argv):
+    store = PortfolioStore()
+    command = argv[1] if len(argv) > 1 else 'log'
+
+    if command == 'log':
+        for entry in store.entries():
+            stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['time']))
+            if entry['type'] == 'snapshot':
+                projects = entry['data'].get('projects', []) if isinstance(entry['data'], dict) else []
+                details = f"снимок, проектов: {len(projects)}"
+            elif entry['type'] == 'raw':
+                details = f"повреждённый файл, {len(entry['text'])} символов"
+            else:
+                details = f"изменений: {len(entry['ops'])}"
+            print(f"{entry['rev']:>5}  {stamp}  {details}  {entry.get('message', '')}")
+    elif command == 'restore' and len(argv) > 2:
+        try:
+            rev = store.restore(int(argv[2]))
+        except ValueError as e:
+            print(f"[X] {e}")
+            return 1
+        if rev is None:
+            print("[OK] Файл уже совпадает с этой ревизией")
+        else:
+            print(f"[OK] Восстановлено, новая ревизия: {rev}")
+    elif command == 'compact':
+        keep_from = int(argv[2]) if len(argv) > 2 else None
+        try:
+            removed = store.compact(keep_from)
+        except ValueError as e:
+            print(f"[X] {e}")
+            return 1
+        print(f"[OK] Журнал сжат, удалено записей: {removed}")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
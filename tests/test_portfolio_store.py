@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+import json
+import random
+
+import pytest
+
+from portfolio_store import PortfolioStore, serialize
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / 'portfolio.json'
+    path.write_text(serialize({'projects': [{'id': 'a', 'v': 0}]}), encoding='utf-8')
+    return PortfolioStore(str(path))
+
+
+def test_unchanged_content_is_not_written(store):
+    assert store.save(store.load()) is None
+    assert store.entries() == []
+
+
+def test_torn_journal_tail_is_truncated_before_append(store):
+    data = store.load()
+    for v in (1, 2, 3):
+        data['projects'][0]['v'] = v
+        store.save(data)
+
+    # Сбой посреди записи: строка журнала оборвана без перевода строки
+    with open(store.journal_path, 'a', encoding='utf-8') as f:
+        f.write('{"rev":99,"ty')
+
+    data['projects'][0]['v'] = 4
+    rev = store.save(data)
+    data['projects'][0]['v'] = 5
+    store.save(data)
+
+    assert [e['rev'] for e in store.entries()] == [1, 2, 3, 4, 5, 6]
+    assert store.revision(rev)['projects'][0]['v'] == 4
+    with open(store.journal_path, encoding='utf-8') as f:
+        for line in f:
+            json.loads(line)
+
+
+@pytest.mark.parametrize('projects', [
+    [{'id': 'a', 'v': 1}, {'id': 'a', 'v': 2}],
+    [{'id': 'a', 'v': 1}, {'v': 2}],
+])
+def test_projects_without_unique_ids_are_snapshotted(store, projects):
+    rev = store.save({'projects': projects})
+    rev = store.save({'projects': projects, 'extra': 1})
+
+    assert store.entries()[-1]['type'] == 'snapshot'
+    assert store.revision(rev) == {'projects': projects, 'extra': 1}
+
+
+def test_revision_checksum_mismatch_raises(store):
+    data = store.load()
+    data['projects'][0]['v'] = 1
+    rev = store.save(data)
+
+    entries = store.entries()
+    entries[-1]['ops'][0]['project']['v'] = 42
+    with open(store.journal_path, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(e) + '\n' for e in entries)
+
+    with pytest.raises(ValueError):
+        store.revision(rev)
+
+
+def test_restore_over_corrupted_file(store, tmp_path):
+    data = store.load()
+    data['projects'][0]['v'] = 1
+    store.save(data)
+
+    with open(store.path, 'w', encoding='utf-8') as f:
+        f.write('{"projects": [{"id"')
+
+    rev = store.restore(1)
+
+    assert store.load() == {'projects': [{'id': 'a', 'v': 0}]}
+    assert store.entries()[-2]['type'] == 'raw'
+    with pytest.raises(ValueError):
+        store.revision(rev - 1)
+
+
+@pytest.mark.parametrize('keep_from', [0, 100])
+def test_compact_rejects_unknown_revision(store, keep_from):
+    data = store.load()
+    data['projects'][0]['v'] = 1
+    store.save(data)
+
+    with pytest.raises(ValueError):
+        store.compact(keep_from)
+    assert [e['rev'] for e in store.entries()] == [1, 2]
+
+
+def test_compact_keeps_hand_formatted_file_hash(store):
+    hand_formatted = '{"projects": [{"id": "a", "v": 7}]}'
+    with open(store.path, 'w', encoding='utf-8') as f:
+        f.write(hand_formatted)
+    store.save({'projects': [{'id': 'a', 'v': 8}]})
+
+    # Сбой сразу после снимка внешнего изменения: файл ещё в ручном формате
+    first = store.entries()[0]
+    assert 'file_sha' in first
+    with open(store.journal_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(first) + '\n')
+    with open(store.path, 'w', encoding='utf-8') as f:
+        f.write(hand_formatted)
+
+    store.compact()
+    assert store.entries()[0]['file_sha'] == first['file_sha']
+    assert store.entries()[0]['time'] == first['time']
+
+    assert store.save({'projects': [{'id': 'a', 'v': 9}]}) == 2
+    assert [e['type'] for e in store.entries()] == ['snapshot', 'diff']
+
+
+def test_random_edits_round_trip_through_compaction(store):
+    rng = random.Random(1234)
+    data = store.load()
+    expected = {1: serialize(data)}
+    next_id = 0
+
+    for _ in range(60):
+        action = rng.choice(['add', 'delete', 'reorder', 'edit', 'meta'])
+        projects = data['projects']
+        if action == 'add' or not projects:
+            next_id += 1
+            projects.insert(rng.randrange(len(projects) + 1), {'id': f'p{next_id}', 'v': 0})
+        elif action == 'delete':
+            projects.pop(rng.randrange(len(projects)))
+        elif action == 'reorder':
+            rng.shuffle(projects)
+        elif action == 'edit':
+            rng.choice(projects)['v'] = rng.randrange(1000)
+        else:
+            key = rng.choice(['title', 'updated'])
+            if key in data and rng.random() < 0.3:
+                del data[key]
+            else:
+                data[key] = rng.randrange(1000)
+        rev = store.save(data)
+        if rev is not None:
+            expected[rev] = serialize(data)
+
+    for rev, text in expected.items():
+        assert serialize(store.revision(rev)) == text
+    assert {e['type'] for e in store.entries()} == {'snapshot', 'diff'}
+
+    keep_from = sorted(expected)[len(expected) // 2]
+    store.compact(keep_from)
+    for rev, text in expected.items():
+        if rev >= keep_from:
+            assert serialize(store.revision(rev)) == text
+        else:
+            with pytest.raises(ValueError):
+                store.revision(rev)
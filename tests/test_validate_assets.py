@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from validate_assets import Report, check_portfolio, resolve, validate
+
+
+@pytest.mark.parametrize('page, url, expected', [
+    ('index.html', '/', 'index.html'),
+    ('index.html', './', 'index.html'),
+    ('index.html', 'images/', 'images/index.html'),
+    ('a/b.html', '../x.jpg?v=1#top', 'x.jpg'),
+    ('index.html', 'https://example.com/x.jpg', None),
+    ('index.html', '${project.mainImage}', None),
+])
+def test_resolve(page, url, expected):
+    assert resolve(page, url) == expected
+
+
+def test_resolve_rejects_links_above_root():
+    with pytest.raises(ValueError):
+        resolve('index.html', '../../x.jpg')
+
+
+def test_malformed_projects_are_reported():
+    report = Report({'images/portfolio/a/1.jpg'})
+    check_portfolio(report, 'portfolio.json', {'projects': [
+        'broken',
+        {'id': 'a', 'mainImage': 'images/portfolio/a/1.jpg', 'gallery': 'x'},
+        {'id': ['x'], 'mainImage': 'images/portfolio/a/1.jpg'},
+    ]}, None)
+
+    assert len(report.errors) == 3
+
+
+def test_pages_in_subfolders_are_checked(tmp_path):
+    (tmp_path / 'data').mkdir()
+    (tmp_path / 'data' / 'portfolio.json').write_text('{"projects": []}', encoding='utf-8')
+    (tmp_path / 'blog').mkdir()
+    (tmp_path / 'blog' / 'post.html').write_text('<img src="missing.jpg"><a href="../">', encoding='utf-8')
+    (tmp_path / 'index.html').write_text('', encoding='utf-8')
+
+    report = validate(str(tmp_path))
+
+    assert report.pages == 2
+    assert report.errors == ["blog/post.html:1: файл не найден: 'blog/missing.jpg'"]
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from volume_history import HistoryReader, VolumeHistory, main, summarize
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'history.bin')
+
+
+def test_ring_keeps_latest_records_in_order(path):
+    writer = VolumeHistory(path, capacity=4)
+    reader = HistoryReader(path)
+    for i in range(6):
+        writer.record(i, -i, 0.1 * i, 0.5, 0.5)
+
+    assert list(reader.snapshot()['timestamp']) == [3, 4, 5]
+    assert list(reader.tail(2)['timestamp']) == [4, 5]
+    data, position = reader.since(5)
+    assert list(data['timestamp']) == [5] and position == 6
+
+
+def test_slot_being_overwritten_is_not_read(path):
+    writer = VolumeHistory(path, capacity=4)
+    reader = HistoryReader(path)
+    for i in range(6):
+        writer.record(i, -i, 0.1 * i, 0.5, 0.5)
+
+    # Запись №6 начата, но счётчик ещё не увеличен
+    writer._timestamp[6 % 4] = 6
+    writer._db[6 % 4] = -6
+
+    data = reader.snapshot()
+    assert list(data['timestamp']) == [3, 4, 5]
+    assert summarize(data)['seconds'] == 2.0
+
+
+def test_truncated_file_is_rejected(path):
+    VolumeHistory(path, capacity=4)
+    with open(path, 'rb+') as f:
+        f.truncate(80)
+
+    with pytest.raises(ValueError):
+        HistoryReader(path)
+    with pytest.raises(ValueError):
+        VolumeHistory(path)
+
+
+def test_cli_reports_missing_file(path, capsys):
+    assert main(['volume_history.py', '--path', path, 'tail']) == 1
+    assert capsys.readouterr().out.startswith('[X]')
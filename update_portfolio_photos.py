@@ -1,15 +1,16 @@
 # -*- coding: utf-8 -*-
 import os
-import json
 import shutil
 from pathlib import Path
 
+from portfolio_store import PortfolioStore
+
 # Переход в рабочую директорию
 os.chdir(r'C:\Users\pa8hka\Desktop\site')
 
 # Загрузка portfolio.json
-with open('data/portfolio.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+store = PortfolioStore('data/portfolio.json')
+data = store.load()
 
 print(f"Загружено проектов: {len(data['projects'])}\n")
 
@@ -175,8 +176,10 @@ if errors:
         print(f"   - {error}")
 
 print(f"\nСохранение portfolio.json...")
-with open('data/portfolio.json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, ensure_ascii=False, indent=2)
+revision = store.save(data, message=f"update_portfolio_photos: обновлено {updated_count}")
 
-print(f"[OK] Файл portfolio.json обновлен!")
+if revision is None:
+    print(f"[OK] Изменений нет, portfolio.json не перезаписан")
+else:
+    print(f"[OK] Файл portfolio.json обновлен! Ревизия журнала: {revision}")
 print(f"[OK] Готово! Можно проверять сайт.")
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+Проверка целостности ссылок сайта перед публикацией.
+
+Строит в памяти индекс всех файлов сайта (включая images/), разбирает все
+HTML-страницы и JSON-файлы, которые они загружают (при большом числе файлов —
+параллельно в нескольких процессах), и за один
+проход сверяет с индексом каждую ссылку, mainImage, gallery[].url и ID
+проектов из folder_mapping в update_portfolio_photos.py.
+
+Использование:
+    python validate_assets.py [папка_сайта]
+
+Код возврата 1, если найдены ошибки (можно использовать как проверку
+перед публикацией).
+"""
+import ast
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+
+SKIP_DIRS = {'.git', '__pycache__', '.pytest_cache', '.venv', 'venv'}
+URL_ATTRS = {'src', 'href', 'poster', 'data-src'}
+EXTERNAL_SCHEMES = ('http:', 'https:', 'mailto:', 'tel:', 'data:', 'javascript:')
+PORTFOLIO_JSON = 'data/portfolio.json'
+MAPPING_SCRIPT = 'update_portfolio_photos.py'
+# Разбор идёт в чистом Python, поэтому потоки не ускоряют его из-за GIL,
+# а запуск процессов (особенно на Windows) стоит дороже, чем разбор десятка
+# страниц. Процессы включаются, только когда файлов больше этого порога
+PARALLEL_THRESHOLD = 64
+
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+FETCH_RE = re.compile(r"""fetch\(\s*['"]([^'"]+\.json)['"]""")
+
+
+def build_index(root):
+    """Индекс всех файлов сайта: относительные пути в формате URL (через /)"""
+    index = set()
+    for folder, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        rel_folder = os.path.relpath(folder, root).replace(os.sep, '/')
+        prefix = '' if rel_folder == '.' else rel_folder + '/'
+        for name in files:
+            index.add(prefix + name)
+    return index
+
+
+class _LinkCollector(HTMLParser):
+    """Собирает ссылки из атрибутов, style и <style>"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+        self._in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        line = self.getpos()[0]
+        for name, value in attrs:
+            if not value:
+                continue
+            if name in URL_ATTRS:
+                self.links.append((line, value))
+            elif name == 'srcset':
+                for candidate in value.split(','):
+                    if candidate.strip():
+                        self.links.append((line, candidate.split()[0]))
+            elif name == 'style':
+                self.links.extend((line, m.group(2)) for m in CSS_URL_RE.finditer(value))
+        if tag == 'style':
+            self._in_style = True
+
+    def handle_endtag(self, tag):
+        if tag == 'style':
+            self._in_style = False
+
+    def handle_data(self, data):
+        if self._in_style:
+            line = self.getpos()[0]
+            self.links.extend((line, m.group(2)) for m in CSS_URL_RE.finditer(data))
+
+
+def parse_html(root, rel_path):
+    """Разбирает страницу: возвращает ссылки и JSON-файлы, загружаемые через fetch()"""
+    with open(os.path.join(root, rel_path), 'r', encoding='utf-8', errors='replace') as f:
+        text = f.read()
+
+    collector = _LinkCollector()
+    collector.feed(text)
+    collector.close()
+
+    refs = [(f"{rel_path}:{line}", rel_path, url) for line, url in collector.links]
+    fetched = [(rel_path, url) for url in FETCH_RE.findall(text)]
+    return refs, fetched
+
+
+def parse_json(root, rel_path):
+    """Загружает JSON-файл; ошибки разбора возвращаются как текст"""
+    try:
+        with open(os.path.join(root, rel_path), 'r', encoding='utf-8') as f:
+            return json.load(f), None
+    except (OSError, ValueError) as e:
+        return None, str(e)
+
+
+def load_folder_mapping(root):
+    """Читает folder_mapping из update_portfolio_photos.py, не запуская скрипт"""
+    path = os.path.join(root, MAPPING_SCRIPT)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(t, ast.Name) and t.id == 'folder_mapping' for t in node.targets):
+            return ast.literal_eval(node.value)
+    return None
+
+
+def resolve(page, url):
+    """
+    Переводит ссылку со страницы в путь относительно корня сайта или None для
+    внешних. Ссылка на папку указывает на её index.html; ссылка за пределы
+    корня сайта вызывает ValueError.
+    """
+    url = url.strip()
+    if not url or url.startswith('#') or url.lower().startswith(EXTERNAL_SCHEMES):
+        return None
+    # Шаблоны JS (`${project.mainImage}`) проверяются через portfolio.json
+    if '${' in url or '{{' in url:
+        return None
+    path = unquote(urlsplit(url).path)
+    if not path:
+        return None
+    if path.startswith('/'):
+        parts = []
+    else:
+        parts = page.split('/')[:-1]
+    for part in path.split('/'):
+        if part in ('', '.'):
+            continue
+        if part == '..':
+            if not parts:
+                raise ValueError(f"ссылка '{url}' ведёт за пределы сайта")
+            parts.pop()
+        else:
+            parts.append(part)
+    if not parts or path.endswith('/') or path.split('/')[-1] in ('.', '..'):
+        parts.append('index.html')
+    return '/'.join(parts)
+
+
+class Report:
+    """Результаты проверки: ошибки, предупреждения и счётчики"""
+
+    def __init__(self, index):
+        self.index = index
+        self._lower_index = None
+        self.errors = []
+        self.warnings = []
+        self.checked = 0
+        self.pages = 0
+        self.json_files = 0
+
+    def check_path(self, where, path, what='файл'):
+        """Проверяет наличие файла в индексе"""
+        self.checked += 1
+        if path in self.index:
+            return True
+        if self._lower_index is None:
+            self._lower_index = {p.lower(): p for p in self.index}
+        hint = self._lower_index.get(path.lower())
+        if hint:
+            self.errors.append(f"{where}: {what} '{path}' отличается регистром от '{hint}'")
+        else:
+            self.errors.append(f"{where}: {what} не найден: '{path}'")
+        return False
+
+
+def check_portfolio(report, rel_path, data, folder_mapping):
+    """
+    Проверяет проекты portfolio.json: ID, mainImage, gallery[].url.
+    Пути в JSON указываются от корня сайта, как их использует portfolio.html.
+    """
+    projects = data.get('projects') if isinstance(data, dict) else None
+    if not isinstance(projects, list):
+        report.errors.append(f"{rel_path}: нет списка 'projects'")
+        return
+
+    seen = set()
+    for number, project in enumerate(projects):
+        if not isinstance(project, dict):
+            report.errors.append(f"{rel_path}: projects[{number}] не является объектом")
+            continue
+        project_id = project.get('id')
+        where = f"{rel_path}: projects[{number}] ({project_id})"
+        if not project_id:
+            report.errors.append(f"{where}: не указан id")
+            continue
+        if not isinstance(project_id, str):
+            report.errors.append(f"{where}: id должен быть строкой")
+            continue
+        if project_id in seen:
+            report.errors.append(f"{where}: повторяющийся id")
+        seen.add(project_id)
+
+        if folder_mapping is not None and project_id not in folder_mapping:
+            report.errors.append(f"{where}: id отсутствует в folder_mapping ({MAPPING_SCRIPT})")
+
+        main_image = project.get('mainImage')
+        if not isinstance(main_image, str):
+            main_image = None
+        if not main_image:
+            report.errors.append(f"{where}: не указан mainImage")
+        else:
+            report.check_path(f"{where} mainImage", main_image.lstrip('/'))
+            if not main_image.startswith(f"images/portfolio/{project_id}/"):
+                report.warnings.append(f"{where}: mainImage лежит вне images/portfolio/{project_id}/")
+
+        gallery = project.get('gallery', [])
+        if not isinstance(gallery, list):
+            report.errors.append(f"{where}: gallery не является списком")
+            gallery = []
+        gallery_urls = set()
+        for i, item in enumerate(gallery):
+            url = item.get('url') if isinstance(item, dict) else None
+            if not url or not isinstance(url, str):
+                report.errors.append(f"{where}: gallery[{i}] без url")
+                continue
+            gallery_urls.add(url)
+            report.check_path(f"{where} gallery[{i}]", url.lstrip('/'))
+        if main_image and gallery_urls and main_image not in gallery_urls:
+            report.warnings.append(f"{where}: mainImage не входит в gallery")
+
+    if folder_mapping is not None:
+        for project_id in folder_mapping:
+            if project_id not in seen:
+                report.warnings.append(f"{MAPPING_SCRIPT}: folder_mapping содержит '{project_id}', "
+                                       f"которого нет в {rel_path}")
+
+
+def check_json_paths(report, rel_path, data, trail=''):
+    """Проверяет строки вида images/... в произвольном JSON"""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            check_json_paths(report, rel_path, value, f"{trail}.{key}" if trail else key)
+    elif isinstance(data, list):
+        for i, value in enumerate(data):
+            check_json_paths(report, rel_path, value, f"{trail}[{i}]")
+    elif isinstance(data, str) and data.startswith('images/'):
+        report.check_path(f"{rel_path}: {trail}", data)
+
+
+def _parse_all(func, root, paths):
+    """Применяет func(root, path) ко всем файлам; много файлов — в пуле процессов"""
+    if len(paths) < PARALLEL_THRESHOLD:
+        return [func(root, path) for path in paths]
+    with ProcessPoolExecutor() as pool:
+        chunksize = max(1, len(paths) // (4 * (os.cpu_count() or 1)))
+        return list(pool.map(func, repeat(root), paths, chunksize=chunksize))
+
+
+def validate(root):
+    """Проверяет сайт в папке root и возвращает отчёт"""
+    root = os.path.abspath(root)
+    index = build_index(root)
+    pages = sorted(p for p in index if p.lower().endswith('.html'))
+    folder_mapping = load_folder_mapping(root)
+    parsed = _parse_all(parse_html, root, pages)
+
+    report = Report(index)
+    json_files = {PORTFOLIO_JSON}
+    for refs, fetched in parsed:
+        for where, page, url in refs:
+            if url.lower().startswith('file:'):
+                report.warnings.append(f"{where}: ссылка на локальный файл '{url}'")
+                continue
+            try:
+                path = resolve(page, url)
+            except ValueError as e:
+                report.errors.append(f"{where}: {e}")
+                continue
+            if path is not None:
+                report.check_path(where, path)
+        for page, url in fetched:
+            try:
+                path = resolve(page, url)
+            except ValueError as e:
+                report.errors.append(f"{page}: {e}")
+                continue
+            if path:
+                json_files.add(path)
+
+    json_files = sorted(json_files)
+    loaded = _parse_all(parse_json, root, json_files)
+
+    for rel_path, (data, error) in zip(json_files, loaded):
+        if error:
+            report.errors.append(f"{rel_path}: не удалось прочитать JSON: {error}")
+            continue
+        if rel_path == PORTFOLIO_JSON:
+            check_portfolio(report, rel_path, data, folder_mapping)
+        else:
+            check_json_paths(report, rel_path, data)
+
+    report.pages = len(pages)
+    report.json_files = len(json_files)
+    return report
+
+
+def main(argv):
+    root = argv[1] if len(argv) > 1 else os.path.dirname(os.path.abspath(__file__))
+    started = time.perf_counter()
+    report = validate(root)
+    elapsed = time.perf_counter() - started
+
+    for warning in report.warnings:
+        print(f"[!] {warning}")
+    for error in report.errors:
+        print(f"[X] {error}")
+
+    print(f"\n{'='*70}")
+    print(f"Файлов в индексе: {len(report.index)}, страниц: {report.pages}, "
+          f"JSON: {report.json_files}, проверено ссылок: {report.checked}")
+    print(f"Предупреждений: {len(report.warnings)}, ошибок: {len(report.errors)} "
+          f"({elapsed:.2f} с)")
+    return 1 if report.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
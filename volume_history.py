@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Кольцевая история уровня звука и решений AutoVolumeControl.
+
+Файл фиксированного размера отображается в память (numpy.memmap): заголовок
+с ёмкостью и счётчиком записей, за ним кольцо структурированных записей
+HISTORY_DTYPE. Контроллер пишет в отображение напрямую — без выделения
+массивов и без системных вызовов на каждый блок. Другой процесс может
+подключиться к тому же файлу и читать историю, не останавливая контроллер.
+
+Использование из командной строки:
+    python volume_history.py tail [-n 20] [-f]
+    python volume_history.py stats [--last 3600]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'volume_history.bin')
+# 44100 Гц / 2048 отсчётов ≈ 21.5 блока в секунду, 2**21 записей ≈ сутки работы
+DEFAULT_CAPACITY = 2 ** 21
+
+MAGIC = b'AVCHIST1'
+HEADER_SIZE = 64
+
+HISTORY_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('db', '<f4'),
+    ('loudness', '<f4'),
+    ('old_volume', '<f4'),
+    ('new_volume', '<f4'),
+])
+
+HEADER_DTYPE = np.dtype({
+    'names': ['magic', 'capacity', 'itemsize', 'count'],
+    'formats': ['S8', '<u8', '<u8', '<u8'],
+    'offsets': [0, 8, 16, 24],
+    'itemsize': HEADER_SIZE,
+})
+
+
+def _open_header(path, mode):
+    header = np.memmap(path, dtype=HEADER_DTYPE, mode=mode, shape=(1,))
+    if header['magic'][0] != MAGIC or header['itemsize'][0] != HISTORY_DTYPE.itemsize:
+        raise ValueError(f"{path}: не файл истории громкости или другой формат записей")
+    expected = HEADER_SIZE + int(header['capacity'][0]) * HISTORY_DTYPE.itemsize
+    if os.path.getsize(path) < expected:
+        raise ValueError(f"{path}: файл истории обрезан")
+    return header
+
+
+class VolumeHistory:
+    """Запись истории в кольцевой файл (используется контроллером)"""
+
+    def __init__(self, path=DEFAULT_PATH, capacity=DEFAULT_CAPACITY):
+        # Существующий файл продолжаем с его собственной ёмкостью,
+        # чтобы перезапуск контроллера не стирал историю
+        if not os.path.exists(path) or os.path.getsize(path) < HEADER_SIZE:
+            with open(path, 'wb') as f:
+                f.truncate(HEADER_SIZE + capacity * HISTORY_DTYPE.itemsize)
+            header = np.memmap(path, dtype=HEADER_DTYPE, mode='r+', shape=(1,))
+            header['magic'] = MAGIC
+            header['capacity'] = capacity
+            header['itemsize'] = HISTORY_DTYPE.itemsize
+            header['count'] = 0
+            header.flush()
+            del header
+
+        self.path = path
+        self._header = _open_header(path, 'r+')
+        self.capacity = int(self._header['capacity'][0])
+        self._records = np.memmap(path, dtype=HISTORY_DTYPE, mode='r+',
+                                  offset=HEADER_SIZE, shape=(self.capacity,))
+
+        # Представления полей создаются один раз, запись идёт по индексу
+        self._count = self._header['count']
+        self._timestamp = self._records['timestamp']
+        self._db = self._records['db']
+        self._loudness = self._records['loudness']
+        self._old_volume = self._records['old_volume']
+        self._new_volume = self._records['new_volume']
+        self._next = int(self._count[0])
+
+    def record(self, timestamp, db, loudness, old_volume, new_volume):
+        """Добавляет запись; счётчик обновляется последним, чтобы читатель не увидел полузаписанную"""
+        i = self._next % self.capacity
+        self._timestamp[i] = timestamp
+        self._db[i] = db
+        self._loudness[i] = loudness
+        self._old_volume[i] = old_volume
+        self._new_volume[i] = new_volume
+        self._next += 1
+        self._count[0] = self._next
+
+    def flush(self):
+        """Сбрасывает отображение на диск"""
+        self._records.flush()
+        self._header.flush()
+
+
+class HistoryReader:
+    """Чтение истории из другого процесса без остановки контроллера"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._header = _open_header(path, 'r')
+        self.capacity = int(self._header['capacity'][0])
+        self._records = np.memmap(path, dtype=HISTORY_DTYPE, mode='r',
+                                  offset=HEADER_SIZE, shape=(self.capacity,))
+
+    @property
+    def count(self):
+        """Сколько записей сделано за всё время (включая перезаписанные)"""
+        return int(self._header['count'][0])
+
+    def since(self, start):
+        """
+        Возвращает копию записей с порядковым номером >= start в хронологическом
+        порядке и номер, с которого продолжать чтение.
+
+        Самый старый слот кольца — тот, который контроллер перезаписывает
+        следующим (до увеличения счётчика), поэтому он никогда не читается:
+        доступно не больше capacity - 1 последних записей.
+        """
+        end = self.count
+        start = max(start, end - self.capacity + 1, 0)
+        if start >= end:
+            return np.empty(0, dtype=HISTORY_DTYPE), end
+
+        first, last = start % self.capacity, end % self.capacity
+        if first < last:
+            data = np.array(self._records[first:last])
+        else:
+            data = np.concatenate((self._records[first:], self._records[:last]))
+
+        # Пока копировали, контроллер мог перезаписать самые старые записи
+        overwritten = self.count - (self.capacity - 1) - start
+        if overwritten > 0:
+            data = data[overwritten:]
+        return data, end
+
+    def snapshot(self):
+        """Вся доступная история"""
+        return self.since(0)[0]
+
+    def tail(self, n):
+        """Последние n записей"""
+        return self.since(self.count - n)[0]
+
+    def follow(self, interval=0.5):
+        """Генератор новых записей по мере их появления"""
+        position = self.count
+        while True:
+            data, position = self.since(position)
+            if len(data):
+                yield data
+            else:
+                time.sleep(interval)
+
+
+def summarize(data):
+    """Векторная сводка по массиву записей"""
+    changes = data['new_volume'] - data['old_volume']
+    return {
+        'records': len(data),
+        'seconds': float(data['timestamp'][-1] - data['timestamp'][0]),
+        'db_mean': float(data['db'].mean()),
+        'db_min': float(data['db'].min()),
+        'db_max': float(data['db'].max()),
+        'volume_start': float(data['old_volume'][0]),
+        'volume_end': float(data['new_volume'][-1]),
+        'raised': float(changes[changes > 0].sum()),
+        'lowered': float(np.abs(changes[changes < 0]).sum()),
+        'adjustments': int(np.count_nonzero(changes)),
+    }
+
+
+def _print_records(data):
+    for row in data:
+        stamp = time.strftime('%H:%M:%S', time.localtime(row['timestamp']))
+        print(f"{stamp}  {row['db']:7.1f} dB  громкость восприятия {row['loudness']:.2f}  "
+              f"{row['old_volume'] * 100:5.1f}% -> {row['new_volume'] * 100:5.1f}%")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="История автоматической регулировки громкости")
+    parser.add_argument('--path', default=DEFAULT_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    tail_parser = commands.add_parser('tail', help="последние записи")
+    tail_parser.add_argument('-n', type=int, default=20)
+    tail_parser.add_argument('-f', '--follow', action='store_true')
+    stats_parser = commands.add_parser('stats', help="сводка по истории")
+    stats_parser.add_argument('--last', type=float, help="только последние N секунд")
+    args = parser.parse_args(argv[1:])
+
+    try:
+        reader = HistoryReader(args.path)
+    except (OSError, ValueError) as e:
+        print(f"[X] Не удалось открыть историю {args.path}: {e}")
+        return 1
+
+    if args.command == 'tail':
+        _print_records(reader.tail(args.n))
+        if args.follow:
+            try:
+                for data in reader.follow():
+                    _print_records(data)
+            except KeyboardInterrupt:
+                pass
+        return 0
+
+    data = reader.snapshot()
+    if args.last is not None and len(data):
+        data = data[data['timestamp'] >= data['timestamp'][-1] - args.last]
+    if not len(data):
+        print("История пуста")
+        return 0
+
+    s = summarize(data)
+    print(f"Записей: {s['records']} за {s['seconds'] / 3600:.2f} ч")
+    print(f"Уровень звука: средний {s['db_mean']:.1f} dB, от {s['db_min']:.1f} до {s['db_max']:.1f} dB")
+    print(f"Громкость: {s['volume_start'] * 100:.1f}% -> {s['volume_end'] * 100:.1f}%")
+    print(f"Изменений: {s['adjustments']}, суммарно вверх {s['raised'] * 100:.1f}%, "
+          f"вниз {s['lowered'] * 100:.1f}%")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))